@@ -15,14 +15,74 @@ import json
 import os
 import re
 import argparse
+import atexit
 import hashlib
+import secrets
+import threading
+import weakref
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, List, Dict, Any, Tuple
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Iterator, Set, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional: faster metadata (de)serialisation
+    orjson = None
+
+# orjson cannot round-trip everything the stdlib accepts: it rejects integers beyond 64 bits,
+# writes NaN/Infinity as null, and reads such integers back as floats. Those payloads take the
+# stdlib path so stored metadata is identical either way.
+_LONG_INT_RE = re.compile(r"[0-9]{19}")
+
+
+def _dumps(obj: Any) -> str:
+    if orjson is not None:
+        try:
+            out = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            if b"null" not in out:  # may be a non-finite float orjson rewrote
+                return out.decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def _loads(raw: str) -> Any:
+    if orjson is not None and not _LONG_INT_RE.search(raw):
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:  # NaN / Infinity literals
+            pass
+    return json.loads(raw)
+
+
 DB_PATH = os.environ.get("NOTIFICATION_HUB_DB", str(Path.home() / ".blackroad" / "notification_hub.db"))
 
+# Database paths whose schema has already been created in this process.
+_INITIALIZED: Set[str] = set()
+_INIT_LOCK = threading.Lock()
+
+# Long-lived connections, one per (thread, db_path); see get_db_connection().
+_POOL = threading.local()
+
+
+def _uuid7() -> str:
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48-bit Unix ms timestamp, then random bits.
+    New notification ids sort by creation time, so inserts append to the primary-key B-tree.
+    """
+    if hasattr(uuid, "uuid7"):  # Python 3.14+
+        return str(uuid.uuid7())
+    ts_ms = time.time_ns() // 1_000_000
+    bits = (ts_ms & ((1 << 48) - 1)) << 80
+    bits |= 0x7 << 76                        # version
+    bits |= secrets.randbits(12) << 64       # rand_a
+    bits |= 0b10 << 62                       # variant
+    bits |= secrets.randbits(62)             # rand_b
+    return str(uuid.UUID(int=bits))
+
 
 # ---------------------------------------------------------------------------
 # Enums & Data Classes
@@ -54,7 +114,7 @@ class Notification:
     status: NotificationStatus = NotificationStatus.PENDING
     sent_at: Optional[float] = None
     created_at: float = field(default_factory=time.time)
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None
     retry_count: int = 0
 
     @classmethod
@@ -68,7 +128,7 @@ class Notification:
         metadata: Optional[Dict[str, Any]] = None,
     ) -> "Notification":
         return cls(
-            id=str(uuid.uuid4()),
+            id=_uuid7(),
             type=type,
             recipient=recipient,
             subject=subject,
@@ -93,6 +153,24 @@ class Notification:
         }
 
 
+def _get_metadata(self: Notification) -> Dict[str, Any]:
+    if self._metadata is None:
+        raw = self._metadata_raw
+        self._metadata = {} if raw in (None, "", "{}") else _loads(raw)
+        self._metadata_raw = None
+    return self._metadata
+
+
+def _set_metadata(self: Notification, value: Optional[Dict[str, Any]]) -> None:
+    self._metadata = value
+    # Raw JSON from the database, parsed on first read; set by _row_to_notification.
+    self._metadata_raw = None
+
+
+# Installed after @dataclass so the generated __init__ still accepts metadata=...
+Notification.metadata = property(_get_metadata, _set_metadata)  # type: ignore[assignment]
+
+
 @dataclass
 class DeliveryLog:
     """One delivery attempt record."""
@@ -124,11 +202,15 @@ class Template:
     subject_template: str
     body_template: str
     created_at: float = field(default_factory=time.time)
+    _compiled: Tuple[tuple, tuple] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._compiled = (_compile_template(self.subject_template), _compile_template(self.body_template))
 
     def render(self, context: Dict[str, Any]) -> Tuple[str, str]:
         """Return (rendered_subject, rendered_body)."""
-        subject = _simple_render(self.subject_template, context)
-        body = _simple_render(self.body_template, context)
+        subject = _render_tokens(self._compiled[0], context)
+        body = _render_tokens(self._compiled[1], context)
         return subject, body
 
     def to_dict(self) -> Dict[str, Any]:
@@ -145,14 +227,37 @@ class Template:
 # Template rendering
 # ---------------------------------------------------------------------------
 
-def _simple_render(template: str, context: Dict[str, Any]) -> str:
+_PLACEHOLDER_RE = re.compile(r"\{\{([^}]+?)\}\}")
+
+
+_LITERAL = 0
+_VARIABLE = 1
+
+
+@lru_cache(maxsize=256)
+def _compile_template(template: str) -> tuple:
     """
-    Render a template by replacing {{variable}} placeholders.
-    Supports dotted access: {{user.name}} -> context["user"]["name"]
+    Pre-parse a template into a token tuple.
+    Literal text becomes (_LITERAL, text); each placeholder becomes
+    (_VARIABLE, (key_parts, original_placeholder_text)).
     """
-    def replacer(match: re.Match) -> str:
-        key = match.group(1).strip()
-        parts = key.split(".")
+    tokens = []
+    for i, piece in enumerate(_PLACEHOLDER_RE.split(template)):
+        if i % 2 == 0:
+            if piece:
+                tokens.append((_LITERAL, piece))
+        else:
+            tokens.append((_VARIABLE, (tuple(piece.strip().split(".")), "{{" + piece + "}}")))
+    return tuple(tokens)
+
+
+def _render_tokens(tokens: tuple, context: Dict[str, Any]) -> str:
+    out = []
+    for kind, payload in tokens:
+        if kind == _LITERAL:
+            out.append(payload)
+            continue
+        parts, placeholder = payload
         value: Any = context
         try:
             for part in parts:
@@ -160,11 +265,18 @@ def _simple_render(template: str, context: Dict[str, Any]) -> str:
                     value = value[part]
                 else:
                     value = getattr(value, part)
-            return str(value)
+            out.append(str(value))
         except (KeyError, AttributeError, TypeError):
-            return match.group(0)  # leave placeholder intact if missing
+            out.append(placeholder)  # leave placeholder intact if missing
+    return "".join(out)
 
-    return re.sub(r"\{\{(.+?)\}\}", replacer, template)
+
+def _simple_render(template: str, context: Dict[str, Any]) -> str:
+    """
+    Render a template by replacing {{variable}} placeholders.
+    Supports dotted access: {{user.name}} -> context["user"]["name"]
+    """
+    return _render_tokens(_compile_template(template), context)
 
 
 # ---------------------------------------------------------------------------
@@ -177,154 +289,329 @@ def _ensure_dir(db_path: str) -> None:
         os.makedirs(parent, exist_ok=True)
 
 
+# Per-connection settings, applied once when a pooled connection is opened.
+# synchronous=NORMAL is durable under WAL; mmap_size lets warm reads skip pread().
+_CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-64000;
+    PRAGMA mmap_size=268435456;
+"""
+
+
+class _ThreadConnections(dict):
+    """
+    One thread's pooled connections, keyed by db_path.
+    Held only by the thread-local, so it is finalised (in the owning thread) when the
+    thread exits, closing its connections.
+    """
+
+    def close(self) -> None:
+        for conn in self.values():
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:  # owned by a thread that is still running
+                pass
+        self.clear()
+
+    __del__ = close
+    # Compared by identity so instances can live in a WeakSet.
+    __hash__ = object.__hash__
+    __eq__ = object.__eq__
+
+
+# Weak registry of every thread's pool, swept at interpreter exit.
+_THREAD_POOLS: "weakref.WeakSet[_ThreadConnections]" = weakref.WeakSet()
+
+
 def get_db_connection(db_path: str = DB_PATH) -> sqlite3.Connection:
-    _ensure_dir(db_path)
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
+    """
+    Return this thread's pooled connection for *db_path*, opening it on first use.
+    Connections run in autocommit mode; multi-statement writes issue an explicit BEGIN
+    and rely on ``with conn:`` to COMMIT (or ROLLBACK on error).
+    """
+    conns: Optional[_ThreadConnections] = getattr(_POOL, "conns", None)
+    if conns is None:
+        conns = _POOL.conns = _ThreadConnections()
+        _THREAD_POOLS.add(conns)
+    conn = conns.get(db_path)
+    if conn is None:
+        _ensure_dir(db_path)
+        conn = sqlite3.connect(db_path, isolation_level=None, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(_CONNECTION_PRAGMAS)
+        conns[db_path] = conn
     return conn
 
 
+@atexit.register
+def _close_connections() -> None:
+    for conns in list(_THREAD_POOLS):
+        conns.close()
+
+
+# Bump when the DDL below changes; init_db() only runs it for older databases.
+_SCHEMA_VERSION = 2
+
+_SCHEMA_SQL = """
+    CREATE TABLE IF NOT EXISTS notifications (
+        id           TEXT PRIMARY KEY,
+        type         TEXT NOT NULL,
+        recipient    TEXT NOT NULL,
+        subject      TEXT NOT NULL,
+        body         TEXT NOT NULL,
+        channel      TEXT NOT NULL,
+        status       TEXT NOT NULL DEFAULT 'pending',
+        sent_at      REAL,
+        created_at   REAL NOT NULL,
+        metadata     TEXT NOT NULL DEFAULT '{}',
+        retry_count  INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS templates (
+        name             TEXT PRIMARY KEY,
+        channel          TEXT NOT NULL,
+        subject_template TEXT NOT NULL,
+        body_template    TEXT NOT NULL,
+        created_at       REAL NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS delivery_log (
+        id              INTEGER PRIMARY KEY AUTOINCREMENT,
+        notification_id TEXT NOT NULL,
+        channel         TEXT NOT NULL,
+        attempt_at      REAL NOT NULL,
+        success         INTEGER NOT NULL,
+        error_msg       TEXT,
+        latency_ms      REAL,
+        FOREIGN KEY (notification_id) REFERENCES notifications(id)
+    );
+
+    -- (recipient, status, created_at) serves get_unread's filter and sort;
+    -- it supersedes the old (recipient, status) index.
+    DROP INDEX IF EXISTS idx_notif_recipient;
+    CREATE INDEX IF NOT EXISTS idx_notif_recipient_status_created
+        ON notifications(recipient, status, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_notif_status
+        ON notifications(status);
+    CREATE INDEX IF NOT EXISTS idx_notif_channel
+        ON notifications(channel, status);
+    CREATE INDEX IF NOT EXISTS idx_delivery_notif
+        ON delivery_log(notification_id);
+
+    -- Running per-channel delivery totals ('attempts_<channel>', 'success_<channel>'),
+    -- kept current by trigger so notification_stats never scans delivery_log.
+    CREATE TABLE IF NOT EXISTS stats_counters (
+        key   TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+
+    -- Backfill from rows logged before the trigger existed.
+    INSERT OR IGNORE INTO stats_counters (key, value)
+        SELECT 'attempts_' || channel, COUNT(*) FROM delivery_log GROUP BY channel;
+    INSERT OR IGNORE INTO stats_counters (key, value)
+        SELECT 'success_' || channel, SUM(success) FROM delivery_log GROUP BY channel;
+
+    CREATE TRIGGER IF NOT EXISTS trg_delivery_count AFTER INSERT ON delivery_log BEGIN
+        INSERT INTO stats_counters (key, value) VALUES ('attempts_' || NEW.channel, 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1;
+        INSERT INTO stats_counters (key, value) VALUES ('success_' || NEW.channel, NEW.success)
+            ON CONFLICT(key) DO UPDATE SET value = value + NEW.success;
+    END;
+"""
+
+
 def init_db(db_path: str = DB_PATH) -> None:
-    """Create all schema objects."""
+    """Create all schema objects, skipping the DDL if the database is already current."""
     _ensure_dir(db_path)
     with get_db_connection(db_path) as conn:
-        conn.executescript("""
-            CREATE TABLE IF NOT EXISTS notifications (
-                id           TEXT PRIMARY KEY,
-                type         TEXT NOT NULL,
-                recipient    TEXT NOT NULL,
-                subject      TEXT NOT NULL,
-                body         TEXT NOT NULL,
-                channel      TEXT NOT NULL,
-                status       TEXT NOT NULL DEFAULT 'pending',
-                sent_at      REAL,
-                created_at   REAL NOT NULL,
-                metadata     TEXT NOT NULL DEFAULT '{}',
-                retry_count  INTEGER NOT NULL DEFAULT 0
-            );
-
-            CREATE TABLE IF NOT EXISTS templates (
-                name             TEXT PRIMARY KEY,
-                channel          TEXT NOT NULL,
-                subject_template TEXT NOT NULL,
-                body_template    TEXT NOT NULL,
-                created_at       REAL NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS delivery_log (
-                id              INTEGER PRIMARY KEY AUTOINCREMENT,
-                notification_id TEXT NOT NULL,
-                channel         TEXT NOT NULL,
-                attempt_at      REAL NOT NULL,
-                success         INTEGER NOT NULL,
-                error_msg       TEXT,
-                latency_ms      REAL,
-                FOREIGN KEY (notification_id) REFERENCES notifications(id)
-            );
-
-            CREATE INDEX IF NOT EXISTS idx_notif_recipient
-                ON notifications(recipient, status);
-            CREATE INDEX IF NOT EXISTS idx_notif_channel
-                ON notifications(channel, status);
-            CREATE INDEX IF NOT EXISTS idx_delivery_notif
-                ON delivery_log(notification_id);
-        """)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+            conn.executescript(
+                "BEGIN;" + _SCHEMA_SQL + f"PRAGMA user_version = {_SCHEMA_VERSION}; COMMIT;"
+            )
+
+
+def _ensure_init(db_path: str) -> None:
+    """Run init_db() at most once per *db_path* per process."""
+    if db_path in _INITIALIZED:
+        return
+    with _INIT_LOCK:
+        if db_path not in _INITIALIZED:
+            init_db(db_path)
+            _INITIALIZED.add(db_path)
 
 
 # ---------------------------------------------------------------------------
 # Core API
 # ---------------------------------------------------------------------------
 
-def _row_to_notification(row: sqlite3.Row) -> Notification:
-    return Notification(
-        id=row["id"],
-        type=row["type"],
-        recipient=row["recipient"],
-        subject=row["subject"],
-        body=row["body"],
-        channel=Channel(row["channel"]),
-        status=NotificationStatus(row["status"]),
-        sent_at=row["sent_at"],
-        created_at=row["created_at"],
-        metadata=json.loads(row["metadata"] or "{}"),
-        retry_count=row["retry_count"],
+# Fresh notifications carry a newly generated id, so the write path is a plain
+# INSERT; retries update the existing rows in place (see retry_failed).
+_SQL_INSERT_NOTIF = """
+    INSERT INTO notifications
+        (id, type, recipient, subject, body, channel, status, sent_at,
+         created_at, metadata, retry_count)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_LOG = """
+    INSERT INTO delivery_log
+        (notification_id, channel, attempt_at, success, error_msg, latency_ms)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_RETRYABLE = (
+    "status = 'failed' AND channel IN ("
+    + ", ".join(f"'{c.value}'" for c in Channel)
+    + ")"
+)
+
+_SQL_LOG_RETRY = (
+    "INSERT INTO delivery_log "
+    "(notification_id, channel, attempt_at, success, error_msg, latency_ms) "
+    f"SELECT id, channel, ?, 1, NULL, 0.0 FROM notifications WHERE {_RETRYABLE}"
+)
+
+_SQL_UPDATE_RETRY = (
+    "UPDATE notifications SET status = 'sent', sent_at = ?, retry_count = retry_count + 1 "
+    f"WHERE {_RETRYABLE}"
+)
+
+_STATUS_SUMS = ", ".join(f"SUM(status = '{s.value}') AS {s.value}" for s in NotificationStatus)
+
+# Each stats query has an unfiltered and a per-channel form; the per-channel form uses a
+# plain "channel = ?" so SQLite can seek idx_notif_channel instead of scanning.
+_SQL_STATS_COUNTS = f"SELECT COUNT(*) AS total, {_STATUS_SUMS} FROM notifications"
+_SQL_STATS_COUNTS_CHANNEL = _SQL_STATS_COUNTS + " WHERE channel = ?"
+
+_SQL_STATS_BY_CHANNEL = "SELECT channel, COUNT(*) AS cnt FROM notifications GROUP BY channel"
+_SQL_STATS_BY_CHANNEL_ONE = "SELECT channel, COUNT(*) AS cnt FROM notifications WHERE channel = ? GROUP BY channel"
+
+_SQL_STATS_DELIVERY = (
+    "SELECT "
+    "COALESCE(SUM(CASE WHEN substr(key, 1, 9) = 'attempts_' THEN value END), 0) AS total, "
+    "COALESCE(SUM(CASE WHEN substr(key, 1, 8) = 'success_' THEN value END), 0) AS successful "
+    "FROM stats_counters"
+)
+_SQL_STATS_DELIVERY_CHANNEL = _SQL_STATS_DELIVERY + " WHERE key IN ('attempts_' || ?, 'success_' || ?)"
+
+
+_NOTIF_COLS = "id, type, recipient, subject, body, channel, status, sent_at, created_at, metadata, retry_count"
+
+_SQL_SELECT_NOTIF = f"SELECT {_NOTIF_COLS} FROM notifications WHERE id = ?"
+
+_SQL_SELECT_UNREAD = (
+    f"SELECT {_NOTIF_COLS} FROM notifications "
+    "WHERE recipient = ? AND status = ? "
+    "ORDER BY created_at DESC"
+)
+
+
+def _tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """Cursor yielding plain tuples, for queries that select _NOTIF_COLS."""
+    cur = conn.cursor()
+    cur.row_factory = None
+    return cur
+
+
+def _row_to_notification(row: tuple) -> Notification:
+    id_, type_, recipient, subject, body, channel, status, sent_at, created_at, metadata, retry_count = row
+    notification = Notification(
+        id=id_,
+        type=type_,
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        channel=Channel(channel),
+        status=NotificationStatus(status),
+        sent_at=sent_at,
+        created_at=created_at,
+        retry_count=retry_count,
     )
+    notification._metadata_raw = metadata
+    return notification
 
 
-def send_notification(notification: Notification, db_path: str = DB_PATH) -> bool:
+_VALID_CHANNELS = frozenset(c.value for c in Channel)
+
+
+def _attempt_delivery(channel: str) -> Tuple[bool, Optional[str], float, float]:
     """
-    Persist and 'dispatch' a notification.
-    In this implementation delivery is simulated (always succeeds for valid channels).
-    Returns True on success, False on failure.
+    Simulate dispatching to *channel* (always succeeds for valid channels).
+    Returns (success, error_msg, attempted_at, latency_ms).
     """
-    init_db(db_path)
-    start = time.time()
+    start = time.perf_counter()
+    now = time.time()
     success = True
     error_msg = None
 
     # Validate channel
-    try:
-        Channel(notification.channel if isinstance(notification.channel, str) else notification.channel.value)
-    except ValueError:
+    if channel not in _VALID_CHANNELS:
         success = False
-        error_msg = f"Unknown channel: {notification.channel}"
+        error_msg = f"Unknown channel: {channel}"
 
-    now = time.time()
-    latency_ms = (time.time() - start) * 1000
+    latency_ms = (time.perf_counter() - start) * 1000
+    return success, error_msg, now, latency_ms
 
-    new_status = NotificationStatus.SENT if success else NotificationStatus.FAILED
-    sent_at = now if success else None
 
-    with get_db_connection(db_path) as conn:
-        conn.execute(
-            """
-            INSERT OR REPLACE INTO notifications
-                (id, type, recipient, subject, body, channel, status, sent_at,
-                 created_at, metadata, retry_count)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                notification.id,
-                notification.type,
-                notification.recipient,
-                notification.subject,
-                notification.body,
-                notification.channel.value if isinstance(notification.channel, Channel) else notification.channel,
-                new_status.value,
-                sent_at,
-                notification.created_at,
-                json.dumps(notification.metadata),
-                notification.retry_count,
-            ),
-        )
-        conn.execute(
-            """
-            INSERT INTO delivery_log
-                (notification_id, channel, attempt_at, success, error_msg, latency_ms)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (
-                notification.id,
-                notification.channel.value if isinstance(notification.channel, Channel) else notification.channel,
-                now,
-                1 if success else 0,
-                error_msg,
-                round(latency_ms, 3),
-            ),
-        )
-
-    notification.status = new_status
-    notification.sent_at = sent_at
-    return success
+def send_notification(notification: Notification, db_path: str = DB_PATH) -> bool:
+    """
+    Persist and 'dispatch' a notification.
+    In this implementation delivery is simulated (always succeeds for valid channels).
+    Returns True on success, False on failure.
+    """
+    return batch_send([notification], db_path)[notification.id]
 
 
 def batch_send(notifications: List[Notification], db_path: str = DB_PATH) -> Dict[str, bool]:
     """
-    Send multiple notifications in sequence.
+    Send multiple notifications in a single transaction.
     Returns {notification.id: success} mapping.
     """
-    return {n.id: send_notification(n, db_path) for n in notifications}
+    notif_rows = []
+    log_rows = []
+    outcomes = []
+    for notification in notifications:
+        channel = notification.channel.value if isinstance(notification.channel, Channel) else notification.channel
+        success, error_msg, now, latency_ms = _attempt_delivery(channel)
+        new_status = NotificationStatus.SENT if success else NotificationStatus.FAILED
+        sent_at = now if success else None
+        notif_rows.append((
+            notification.id,
+            notification.type,
+            notification.recipient,
+            notification.subject,
+            notification.body,
+            channel,
+            new_status.value,
+            sent_at,
+            notification.created_at,
+            _dumps(notification.metadata) if notification.metadata else "{}",
+            notification.retry_count,
+        ))
+        log_rows.append((
+            notification.id,
+            channel,
+            now,
+            1 if success else 0,
+            error_msg,
+            round(latency_ms, 3),
+        ))
+        outcomes.append((new_status, sent_at, success))
+
+    _ensure_init(db_path)
+    with get_db_connection(db_path) as conn:
+        conn.execute("BEGIN")
+        conn.executemany(_SQL_INSERT_NOTIF, notif_rows)
+        conn.executemany(_SQL_INSERT_LOG, log_rows)
+
+    results: Dict[str, bool] = {}
+    for notification, (new_status, sent_at, success) in zip(notifications, outcomes):
+        notification.status = new_status
+        notification.sent_at = sent_at
+        results[notification.id] = success
+    return results
 
 
 def mark_read(notification_id: str, db_path: str = DB_PATH) -> bool:
@@ -332,7 +619,7 @@ def mark_read(notification_id: str, db_path: str = DB_PATH) -> bool:
     Mark a notification as read.
     Returns True if the notification existed and was updated.
     """
-    init_db(db_path)
+    _ensure_init(db_path)
     with get_db_connection(db_path) as conn:
         res = conn.execute(
             "UPDATE notifications SET status = ? WHERE id = ? AND status != ?",
@@ -341,17 +628,19 @@ def mark_read(notification_id: str, db_path: str = DB_PATH) -> bool:
     return res.rowcount > 0
 
 
+def _iter_unread(recipient: str, db_path: str = DB_PATH) -> Iterator[Notification]:
+    """Yield unread (sent) notifications for *recipient*, newest first, in fetchmany() chunks."""
+    _ensure_init(db_path)
+    cur = _tuple_cursor(get_db_connection(db_path))
+    cur.arraysize = 256
+    cur.execute(_SQL_SELECT_UNREAD, (recipient, NotificationStatus.SENT.value))
+    while chunk := cur.fetchmany():
+        yield from map(_row_to_notification, chunk)
+
+
 def get_unread(recipient: str, db_path: str = DB_PATH) -> List[Notification]:
     """Return all unread (sent) notifications for *recipient*, newest first."""
-    init_db(db_path)
-    with get_db_connection(db_path) as conn:
-        rows = conn.execute(
-            "SELECT * FROM notifications "
-            "WHERE recipient = ? AND status = ? "
-            "ORDER BY created_at DESC",
-            (recipient, NotificationStatus.SENT.value),
-        ).fetchall()
-    return [_row_to_notification(r) for r in rows]
+    return list(_iter_unread(recipient, db_path))
 
 
 def notification_stats(channel: Optional[str] = None, db_path: str = DB_PATH) -> Dict[str, Any]:
@@ -359,35 +648,23 @@ def notification_stats(channel: Optional[str] = None, db_path: str = DB_PATH) ->
     Aggregate delivery statistics.
     If *channel* is given, filter to that channel; otherwise report across all channels.
     """
-    init_db(db_path)
+    _ensure_init(db_path)
     with get_db_connection(db_path) as conn:
-        where = "WHERE channel = ?" if channel else ""
-        params: tuple = (channel,) if channel else ()
-
-        total = conn.execute(
-            f"SELECT COUNT(*) AS cnt FROM notifications {where}", params
-        ).fetchone()["cnt"]
-
-        by_status = conn.execute(
-            f"SELECT status, COUNT(*) AS cnt FROM notifications {where} GROUP BY status", params
-        ).fetchall()
-        status_map = {r["status"]: r["cnt"] for r in by_status}
-
-        by_channel = conn.execute(
-            f"SELECT channel, COUNT(*) AS cnt FROM notifications {where} GROUP BY channel", params
-        ).fetchall()
+        if channel:
+            counts = conn.execute(_SQL_STATS_COUNTS_CHANNEL, (channel,)).fetchone()
+            by_channel = conn.execute(_SQL_STATS_BY_CHANNEL_ONE, (channel,)).fetchall()
+            # Delivery success rate from the trigger-maintained delivery_log counters
+            attempts = conn.execute(_SQL_STATS_DELIVERY_CHANNEL, (channel, channel)).fetchone()
+        else:
+            counts = conn.execute(_SQL_STATS_COUNTS).fetchone()
+            by_channel = conn.execute(_SQL_STATS_BY_CHANNEL).fetchall()
+            attempts = conn.execute(_SQL_STATS_DELIVERY).fetchone()
+
+        total = counts["total"]
+        status_map = {s.value: counts[s.value] for s in NotificationStatus if counts[s.value]}
         channel_map = {r["channel"]: r["cnt"] for r in by_channel}
-
-        # Delivery success rate from delivery_log
-        dl_where = "WHERE channel = ?" if channel else ""
-        dl_params: tuple = (channel,) if channel else ()
-        total_attempts = conn.execute(
-            f"SELECT COUNT(*) AS cnt FROM delivery_log {dl_where}", dl_params
-        ).fetchone()["cnt"]
-        successful = conn.execute(
-            f"SELECT COUNT(*) AS cnt FROM delivery_log {dl_where + (' AND' if channel else 'WHERE')} success = 1",
-            dl_params,
-        ).fetchone()["cnt"]
+        total_attempts = attempts["total"]
+        successful = attempts["successful"]
 
     delivery_rate = round(successful / total_attempts * 100, 2) if total_attempts else 0.0
 
@@ -402,26 +679,35 @@ def notification_stats(channel: Optional[str] = None, db_path: str = DB_PATH) ->
     }
 
 
-def template_render(template_name: str, context: Dict[str, Any], db_path: str = DB_PATH) -> Dict[str, str]:
+@lru_cache(maxsize=256)
+def _load_template(db_path: str, template_name: str) -> Template:
     """
-    Render a stored template against *context*.
-    Returns {"subject": ..., "body": ...}.
-    Raises KeyError if the template does not exist.
+    Fetch and compile a stored template. Cached per (db_path, name);
+    save_template() clears the cache. Raises KeyError if the template does not exist.
     """
-    init_db(db_path)
+    _ensure_init(db_path)
     with get_db_connection(db_path) as conn:
         row = conn.execute(
             "SELECT * FROM templates WHERE name = ?", (template_name,)
         ).fetchone()
     if row is None:
         raise KeyError(f"Template not found: {template_name!r}")
-    tmpl = Template(
+    return Template(
         name=row["name"],
         channel=row["channel"],
         subject_template=row["subject_template"],
         body_template=row["body_template"],
         created_at=row["created_at"],
     )
+
+
+def template_render(template_name: str, context: Dict[str, Any], db_path: str = DB_PATH) -> Dict[str, str]:
+    """
+    Render a stored template against *context*.
+    Returns {"subject": ..., "body": ...}.
+    Raises KeyError if the template does not exist.
+    """
+    tmpl = _load_template(db_path, template_name)
     subject, body = tmpl.render(context)
     return {"subject": subject, "body": body, "channel": tmpl.channel}
 
@@ -434,7 +720,7 @@ def save_template(
     db_path: str = DB_PATH,
 ) -> None:
     """Persist a notification template."""
-    init_db(db_path)
+    _ensure_init(db_path)
     with get_db_connection(db_path) as conn:
         conn.execute(
             """
@@ -444,11 +730,12 @@ def save_template(
             """,
             (name, channel, subject_template, body_template, time.time()),
         )
+    _load_template.cache_clear()
 
 
 def list_templates(db_path: str = DB_PATH) -> List[Dict[str, Any]]:
     """Return all stored templates."""
-    init_db(db_path)
+    _ensure_init(db_path)
     with get_db_connection(db_path) as conn:
         rows = conn.execute("SELECT * FROM templates ORDER BY name").fetchall()
     return [dict(r) for r in rows]
@@ -456,17 +743,17 @@ def list_templates(db_path: str = DB_PATH) -> List[Dict[str, Any]]:
 
 def get_notification(notification_id: str, db_path: str = DB_PATH) -> Optional[Notification]:
     """Fetch a single notification by ID."""
-    init_db(db_path)
+    _ensure_init(db_path)
     with get_db_connection(db_path) as conn:
-        row = conn.execute(
-            "SELECT * FROM notifications WHERE id = ?", (notification_id,)
+        row = _tuple_cursor(conn).execute(
+            _SQL_SELECT_NOTIF, (notification_id,)
         ).fetchone()
     return _row_to_notification(row) if row else None
 
 
 def get_delivery_log(notification_id: str, db_path: str = DB_PATH) -> List[Dict[str, Any]]:
     """Return delivery attempts for a notification."""
-    init_db(db_path)
+    _ensure_init(db_path)
     with get_db_connection(db_path) as conn:
         rows = conn.execute(
             "SELECT * FROM delivery_log WHERE notification_id = ? ORDER BY attempt_at DESC",
@@ -476,19 +763,17 @@ def get_delivery_log(notification_id: str, db_path: str = DB_PATH) -> List[Dict[
 
 
 def retry_failed(db_path: str = DB_PATH) -> int:
-    """Re-attempt delivery for all failed notifications. Returns count retried."""
-    init_db(db_path)
+    """
+    Re-attempt delivery for all failed notifications on a known channel.
+    Every retry is logged and applied in one set-based transaction. Returns count retried.
+    """
+    _ensure_init(db_path)
+    now = time.time()
     with get_db_connection(db_path) as conn:
-        rows = conn.execute(
-            "SELECT * FROM notifications WHERE status = ?", (NotificationStatus.FAILED.value,)
-        ).fetchall()
-    notifications = [_row_to_notification(r) for r in rows]
-    count = 0
-    for notif in notifications:
-        notif.retry_count += 1
-        if send_notification(notif, db_path):
-            count += 1
-    return count
+        conn.execute("BEGIN")
+        conn.execute(_SQL_LOG_RETRY, (now,))
+        res = conn.execute(_SQL_UPDATE_RETRY, (now,))
+    return res.rowcount
 
 
 # ---------------------------------------------------------------------------
@@ -581,8 +866,7 @@ def main() -> None:
         print("Marked as read." if updated else "Not found or already read.")
 
     elif args.command == "unread":
-        notifications = get_unread(args.recipient, db)
-        print(json.dumps([n.to_dict() for n in notifications], indent=2))
+        print(json.dumps([n.to_dict() for n in _iter_unread(args.recipient, db)], indent=2))
 
     elif args.command == "stats":
         print(json.dumps(notification_stats(args.channel, db), indent=2))
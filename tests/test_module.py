@@ -1,13 +1,17 @@
 """Tests for blackroad-notification-hub."""
+import dataclasses
 import os
 import json
 import time
 import pytest
 import sys
+import threading
+import uuid
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
+import module
 from module import (
-    Notification, Channel, NotificationStatus,
+    Notification, Channel, NotificationStatus, Template,
     send_notification, batch_send, mark_read, get_unread,
     notification_stats, template_render, save_template, list_templates,
     get_notification, get_delivery_log, retry_failed, init_db,
@@ -15,6 +19,15 @@ from module import (
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_caches():
+    module._INITIALIZED.clear()
+    module._load_template.cache_clear()
+    yield
+    module._INITIALIZED.clear()
+    module._load_template.cache_clear()
+
+
 @pytest.fixture
 def db(tmp_path):
     return str(tmp_path / "test_notifications.db")
@@ -54,6 +67,61 @@ class TestSendNotification:
         fetched = get_notification(n.id, db)
         assert fetched.metadata == meta
 
+    def test_empty_metadata_stored_as_empty_object(self, db):
+        n = Notification.new("sys", "eve@example.com", "Sys", "Msg", Channel.EMAIL)
+        send_notification(n, db)
+        raw = module.get_db_connection(db).execute(
+            "SELECT metadata FROM notifications WHERE id = ?", (n.id,)
+        ).fetchone()[0]
+        assert raw == "{}"
+        assert get_notification(n.id, db).metadata == {}
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_metadata_serialisation_roundtrip(self, use_orjson, monkeypatch):
+        if use_orjson:
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(module, "orjson", None)
+        meta = {"n": 1, "nested": {"ok": True}, "text": "héllo", "none": None}
+        assert module._loads(module._dumps(meta)) == meta
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_metadata_stdlib_only_values_preserved(self, db, use_orjson, monkeypatch):
+        if use_orjson:
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(module, "orjson", None)
+        meta = {"big": 2 ** 70, "neg": -(2 ** 64) - 1, "f": float("nan"), "inf": float("inf")}
+        n = Notification.new("sys", "eve@example.com", "Sys", "Msg", Channel.EMAIL, metadata=meta)
+        assert send_notification(n, db) is True
+        stored = get_notification(n.id, db).metadata
+        assert stored["big"] == 2 ** 70 and isinstance(stored["big"], int)
+        assert stored["neg"] == -(2 ** 64) - 1 and isinstance(stored["neg"], int)
+        assert stored["f"] != stored["f"]  # NaN
+        assert stored["inf"] == float("inf")
+
+    def test_metadata_parsed_lazily(self, db):
+        n = Notification.new("sys", "eve@example.com", "Sys", "Msg", Channel.EMAIL, metadata={"k": [1, 2]})
+        send_notification(n, db)
+        fetched = get_notification(n.id, db)
+        assert fetched._metadata_raw is not None
+        assert fetched.to_dict()["metadata"] == {"k": [1, 2]}
+        assert fetched._metadata_raw is None
+
+    def test_raw_metadata_not_in_asdict(self, db):
+        n = Notification.new("sys", "eve@example.com", "Sys", "Msg", Channel.EMAIL, metadata={"k": 1})
+        send_notification(n, db)
+        d = dataclasses.asdict(get_notification(n.id, db))
+        assert "_metadata_raw" not in d
+        assert d["metadata"] == {"k": 1}
+
+    def test_metadata_reset_discards_stored_value(self, db):
+        n = Notification.new("sys", "eve@example.com", "Sys", "Msg", Channel.EMAIL, metadata={"k": 1})
+        send_notification(n, db)
+        fetched = get_notification(n.id, db)
+        fetched.metadata = None
+        assert fetched.metadata == {}
+
     def test_different_channels_accepted(self, db):
         for ch in Channel:
             n = Notification.new("t", f"u@test.com", "S", "B", ch)
@@ -81,6 +149,26 @@ class TestBatchSend:
             fetched = get_notification(n.id, db)
             assert fetched is not None
 
+    def test_batch_send_updates_objects_and_logs(self, db):
+        notifications = [
+            Notification.new("a", "u@e.com", "S", "B", Channel.PUSH)
+            for _ in range(3)
+        ]
+        batch_send(notifications, db)
+        for n in notifications:
+            assert n.status == NotificationStatus.SENT
+            assert n.sent_at is not None
+            assert len(get_delivery_log(n.id, db)) == 1
+
+    def test_batch_send_invalid_channel_marked_failed(self, db):
+        n = Notification.new("a", "u@e.com", "S", "B", Channel.EMAIL)
+        n.channel = "pigeon"
+        assert batch_send([n], db) == {n.id: False}
+        assert n.status == NotificationStatus.FAILED
+        log = get_delivery_log(n.id, db)
+        assert log[0]["success"] == 0
+        assert "pigeon" in log[0]["error_msg"]
+
 
 class TestMarkRead:
     def test_mark_read_updates_status(self, db):
@@ -127,6 +215,29 @@ class TestGetUnread:
         send_notification(n, db)
         assert get_unread("nobody@example.com", db) == []
 
+    def test_get_unread_spans_fetch_chunks(self, db):
+        notifications = [
+            Notification.new("t", "bulk@e.com", "S", "B", Channel.EMAIL)
+            for _ in range(300)
+        ]
+        for i, n in enumerate(notifications):
+            n.created_at = 1000.0 + i
+        batch_send(notifications, db)
+        unread = get_unread("bulk@e.com", db)
+        assert len(unread) == 300
+        assert [n.id for n in unread] == [n.id for n in reversed(notifications)]
+
+    def test_get_unread_sort_uses_index(self, db):
+        init_db(db)
+        plan = module.get_db_connection(db).execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM notifications "
+            "WHERE recipient = ? AND status = ? ORDER BY created_at DESC",
+            ("u@e.com", "sent"),
+        ).fetchall()
+        details = " ".join(r["detail"] for r in plan)
+        assert "idx_notif_recipient_status_created" in details
+        assert "TEMP B-TREE" not in details
+
 
 class TestNotificationStats:
     def test_stats_all_channels(self, db):
@@ -147,6 +258,64 @@ class TestNotificationStats:
         assert stats["total_notifications"] >= 2
         assert stats["filter_channel"] == "push"
 
+    def test_stats_counts(self, db):
+        for ch in [Channel.EMAIL, Channel.EMAIL, Channel.SLACK]:
+            send_notification(Notification.new("t", "u@e.com", "S", "B", ch), db)
+        bad = Notification.new("t", "u@e.com", "S", "B", Channel.SLACK)
+        bad.channel = "pigeon"
+        send_notification(bad, db)
+        stats = notification_stats(db_path=db)
+        assert stats["total_notifications"] == 4
+        assert stats["by_status"] == {"sent": 3, "failed": 1}
+        assert stats["by_channel"] == {"email": 2, "slack": 1, "pigeon": 1}
+        assert stats["total_delivery_attempts"] == 4
+        assert stats["successful_deliveries"] == 3
+        assert stats["delivery_success_rate_pct"] == 75.0
+
+        email = notification_stats(channel="email", db_path=db)
+        assert email["total_notifications"] == 2
+        assert email["by_status"] == {"sent": 2}
+        assert email["total_delivery_attempts"] == 2
+
+    def test_stats_counts_include_retries(self, db):
+        n = Notification.new("t", "u@e.com", "S", "B", Channel.EMAIL)
+        send_notification(n, db)
+        module.get_db_connection(db).execute("UPDATE notifications SET status = 'failed' WHERE id = ?", (n.id,))
+        retry_failed(db)
+        stats = notification_stats(channel="email", db_path=db)
+        assert stats["total_delivery_attempts"] == 2
+        assert stats["successful_deliveries"] == 2
+
+    def test_stats_counters_backfilled_on_upgrade(self, db):
+        send_notification(Notification.new("t", "u@e.com", "S", "B", Channel.SLACK), db)
+        conn = module.get_db_connection(db)
+        conn.executescript(
+            "DROP TRIGGER trg_delivery_count; DROP TABLE stats_counters; PRAGMA user_version = 1;"
+        )
+        conn.execute(
+            "INSERT INTO delivery_log (notification_id, channel, attempt_at, success) VALUES ('x', 'slack', 0, 0)"
+        )
+        module._INITIALIZED.clear()
+        stats = notification_stats(channel="slack", db_path=db)
+        assert stats["total_delivery_attempts"] == 2
+        assert stats["successful_deliveries"] == 1
+
+    def test_stats_channel_filter_uses_index(self, db):
+        init_db(db)
+        conn = module.get_db_connection(db)
+        for sql in (module._SQL_STATS_COUNTS_CHANNEL, module._SQL_STATS_BY_CHANNEL_ONE):
+            plan = conn.execute("EXPLAIN QUERY PLAN " + sql, ("email",)).fetchall()
+            details = " ".join(r["detail"] for r in plan)
+            assert "SEARCH" in details
+            assert "idx_notif_channel (channel=?)" in details
+
+    def test_stats_empty_db(self, db):
+        stats = notification_stats(db_path=db)
+        assert stats["total_notifications"] == 0
+        assert stats["by_status"] == {}
+        assert stats["successful_deliveries"] == 0
+        assert stats["delivery_success_rate_pct"] == 0.0
+
 
 class TestTemplateRender:
     def test_render_simple_template(self, db):
@@ -177,6 +346,18 @@ class TestTemplateRender:
         with pytest.raises(KeyError):
             template_render("does_not_exist", {}, db)
 
+    def test_render_reflects_resaved_template(self, db):
+        save_template("greet", "email", "Hi {{name}}", "v1", db)
+        assert template_render("greet", {"name": "A"}, db)["body"] == "v1"
+        save_template("greet", "email", "Hi {{name}}", "v2", db)
+        assert template_render("greet", {"name": "A"}, db)["body"] == "v2"
+
+    def test_render_after_missing_then_saved(self, db):
+        with pytest.raises(KeyError):
+            template_render("late", {}, db)
+        save_template("late", "push", "S", "B", db)
+        assert template_render("late", {}, db)["subject"] == "S"
+
     def test_list_templates_after_save(self, db):
         save_template("t1", "email", "Sub {{x}}", "Body {{x}}", db)
         save_template("t2", "slack", "Alert", "Details", db)
@@ -201,6 +382,20 @@ class TestSimpleRender:
         result = _simple_render("{{user.name}}", {"user": {"name": "Alice"}})
         assert result == "Alice"
 
+    def test_missing_dotted_key_unchanged(self):
+        assert _simple_render("Hi {{user.email}}", {"user": {"name": "Alice"}}) == "Hi {{user.email}}"
+
+    def test_brace_inside_placeholder_not_matched(self):
+        assert _simple_render("{{a}b}}", {"a": "x", "a}b": "y"}) == "{{a}b}}"
+
+    def test_whitespace_in_placeholder(self):
+        assert _simple_render("{{ name }}!", {"name": "Ann"}) == "Ann!"
+        assert _simple_render("{{ other }}!", {}) == "{{ other }}!"
+
+    def test_template_render_uses_compiled_tokens(self):
+        t = Template("t", "email", "Hi {{user.name}}", "Code {{code}} / {{missing}}")
+        assert t.render({"user": {"name": "Ann"}, "code": 7}) == ("Hi Ann", "Code 7 / {{missing}}")
+
 
 class TestRetryFailed:
     def test_retry_returns_count(self, db):
@@ -219,6 +414,77 @@ class TestRetryFailed:
         count = retry_failed(db)
         assert count >= 0  # may succeed on retry
 
+    def test_retry_marks_sent_and_bumps_retry_count(self, db):
+        n = Notification.new("t", "u@e.com", "S", "B", Channel.EMAIL)
+        send_notification(n, db)
+        conn = module.get_db_connection(db)
+        conn.execute("UPDATE notifications SET status = 'failed', sent_at = NULL WHERE id = ?", (n.id,))
+        assert retry_failed(db) == 1
+        fetched = get_notification(n.id, db)
+        assert fetched.status == NotificationStatus.SENT
+        assert fetched.retry_count == 1
+        assert len(get_delivery_log(n.id, db)) == 2
+
+    def test_retry_skips_unknown_channel(self, db):
+        n = Notification.new("t", "u@e.com", "S", "B", Channel.EMAIL)
+        n.channel = "pigeon"
+        send_notification(n, db)
+        assert retry_failed(db) == 0
+        log = get_delivery_log(n.id, db)
+        assert len(log) == 1
+
+
+class TestSchemaInit:
+    def test_init_db_runs_once_per_path(self, db, monkeypatch):
+        calls = []
+        real_init = module.init_db
+        monkeypatch.setattr(module, "init_db", lambda path: (calls.append(path), real_init(path)))
+        assert get_unread("u@e.com", db) == []
+        assert get_unread("u@e.com", db) == []
+        assert calls == [db]
+
+    def test_init_db_sets_schema_version(self, db):
+        init_db(db)
+        conn = module.get_db_connection(db)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == module._SCHEMA_VERSION
+
+    def test_init_db_skips_ddl_when_current(self, db):
+        init_db(db)
+        conn = module.get_db_connection(db)
+        conn.execute("DROP INDEX idx_notif_status")
+        init_db(db)
+        names = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        assert "idx_notif_status" not in names
+
+
+class TestConnectionPool:
+    def test_connection_reused_within_thread(self, db):
+        assert module.get_db_connection(db) is module.get_db_connection(db)
+
+    def test_connection_per_thread(self, db):
+        other = []
+        t = threading.Thread(target=lambda: other.append(module.get_db_connection(db)))
+        t.start()
+        t.join()
+        assert other[0] is not module.get_db_connection(db)
+
+    def test_thread_connections_closed_on_thread_exit(self, db):
+        init_db(db)
+        before = len(module._THREAD_POOLS)
+        threads = [threading.Thread(target=get_unread, args=("u@e.com", db)) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(module._THREAD_POOLS) == before
+
+    def test_connection_pragmas_applied(self, db):
+        conn = module.get_db_connection(db)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -64000
+
 
 class TestNotificationDataclass:
     def test_new_creates_unique_ids(self):
@@ -226,12 +492,26 @@ class TestNotificationDataclass:
         n2 = Notification.new("t", "u@e.com", "S", "B", Channel.EMAIL)
         assert n1.id != n2.id
 
+    def test_new_ids_are_time_ordered_uuid7(self):
+        n1 = Notification.new("t", "u@e.com", "S", "B", Channel.EMAIL)
+        time.sleep(0.002)
+        n2 = Notification.new("t", "u@e.com", "S", "B", Channel.EMAIL)
+        assert uuid.UUID(n1.id).version == 7
+        assert uuid.UUID(n1.id).variant == uuid.RFC_4122
+        assert n1.id < n2.id
+
     def test_to_dict_has_all_fields(self):
         n = Notification.new("alert", "u@e.com", "Sub", "Body", Channel.SLACK)
         d = n.to_dict()
         for field in ["id", "type", "recipient", "subject", "body", "channel", "status"]:
             assert field in d
 
+    def test_metadata_defaults_to_empty_dict(self):
+        n = Notification("id", "t", "u@e.com", "S", "B", Channel.EMAIL)
+        assert n.metadata == {}
+        n.metadata["k"] = "v"
+        assert n.metadata == {"k": "v"}
+
     def test_default_status_is_pending(self):
         n = Notification.new("t", "u@e.com", "S", "B", Channel.PUSH)
         assert n.status == NotificationStatus.PENDING